@@ -1,6 +1,14 @@
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.backends import BackendFilter, backend_registry
+
+_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+# Columns of paralympics_raw.csv used by data_prep, the others are dropped
+KEEP_COLS = ['type', 'year', 'country', 'host', 'start', 'end', 'countries', 'events', 'sports',
+             'participants_m', 'participants_f', 'participants']
 
 def describe_df(df):
     
@@ -13,56 +21,102 @@ def describe_df(df):
     print(df.info())
     print(df.describe())
 
+def missing_mask(df):
+
+    # One isna pass per column on the underlying array, Arrow-backed columns use their null bitmap
+    if df.shape[1] == 0:
+        return np.zeros((len(df), 0), dtype=bool)
+    return np.column_stack([pd.isna(df.iloc[:, i].array) for i in range(df.shape[1])])
+
 def quality_check(df):
     
-    print(df.isna())
-    missing_rows = df[df.isna().any(axis=1)]
-    missing_columns = df.isna().any(axis=0)
+    mask = missing_mask(df)
+    print(pd.Series(mask.sum(axis=0), index=df.columns))
+    missing_rows = df[mask.any(axis=1)]
+    missing_columns = pd.Series(mask.any(axis=0), index=df.columns)
     print(missing_rows, missing_columns)
 
+def show(fig):
+
+    # Only show the figure on an interactive backend (e.g. tkagg, qtagg, or a notebook's
+    # module:// backend), headless ones such as agg, pdf or svg just close it
+    backend = matplotlib.get_backend().lower()
+    interactive = backend_registry.list_builtin(BackendFilter.INTERACTIVE)
+    if backend in interactive or backend.startswith("module://"):
+        plt.show()
+    else:
+        plt.close(fig)
+
 def hist(df):
 
     columns = ["participants_m", "participants_f"]
-    df[columns].hist()
-    plt.show()
+    fig, axes = plt.subplots(1, len(columns))
+    for ax, col in zip(axes, columns):
+        ax.hist(df[col].dropna().to_numpy(dtype=float), bins=10)
+        ax.set_title(col)
+    show(fig)
 
 def boxplot(df):
 
-    df[["sports"]].boxplot()
-    plt.show()
+    fig, ax = plt.subplots()
+    df[["sports"]].boxplot(ax=ax)
+    show(fig)
 
 def timeseries(df):
 
-    df.plot(x="start", y=["participants_m", "participants_f"])
-    plt.show()
+    ax = df.plot(x="start", y=["participants_m", "participants_f"])
+    show(ax.get_figure())
 
 def categorial(df):
     
-    print(df['type'].unique())
-    print(df['type'].value_counts())
-    print(df['disabilities_included'].unique())
-    print(df['disabilities_included'].value_counts())
+    # value_counts already holds the unique values in its index
+    vc_type = df['type'].value_counts(dropna=False)
+    vc_dis = df['disabilities_included'].value_counts(dropna=False)
+    print(vc_type.index.tolist(), vc_type)
+    print(vc_dis.index.tolist(), vc_dis)
 
 def data_prep(df):
-    df_prepared = df.drop(columns=['URL', 'disabilities_included', 'highlights'])
-    
-    df_prepared = df_prepared.drop(index=[0, 17, 31])
-    mask = df_prepared['type'] == 'Summer'
-    df_prepared.loc[mask, 'type'] = df_prepared.loc[mask, 'type'].str.lower()
-    df_prepared['type'] = df_prepared['type'].str.strip()
+    # The unused columns are only present if the whole file was read, see KEEP_COLS
+    unused_columns = df.columns.intersection(['URL', 'disabilities_included', 'highlights'])
+    df_prepared = df.drop(index=[0, 17, 31], columns=unused_columns)
+    # Columns already converted by read_csv (see __main__) are not converted again
+    if isinstance(df_prepared['type'].dtype, pd.CategoricalDtype):
+        # Only the few category labels need cleaning, not every row
+        labels = df_prepared['type'].cat.categories
+        cleaned = labels.str.strip()
+        cleaned = cleaned.where(cleaned != 'Summer', 'summer')
+        df_prepared['type'] = df_prepared['type'].map(dict(zip(labels, cleaned)))
+    else:
+        type_values = df_prepared['type'].astype('string').str.strip()
+        df_prepared['type'] = type_values.mask(type_values.eq('Summer'), 'summer')
+
+    dates = ['start', 'end']
+    for col in dates:
+        if not pd.api.types.is_datetime64_any_dtype(df_prepared[col]):
+            df_prepared[col] = pd.to_datetime(df_prepared[col], format='%d/%m/%Y')
+        elif isinstance(df_prepared[col].dtype, pd.ArrowDtype):
+            # Already parsed, only move from Arrow to NumPy storage so the csv has plain dates
+            df_prepared[col] = df_prepared[col].astype('datetime64[us]')
+
+    # Subtract as whole days in NumPy, NaT dates become <NA> in the masked Int64 array
+    start = df_prepared['start'].to_numpy(dtype='datetime64[D]')
+    end = df_prepared['end'].to_numpy(dtype='datetime64[D]')
+    duration_values = pd.arrays.IntegerArray((end - start).astype('int64'),
+                                             np.isnat(start) | np.isnat(end))
 
     columns_to_change= ['countries', 'events', 'participants_m', 'participants_f', 'participants']
-    df_prepared[columns_to_change] = df_prepared[columns_to_change].astype('Int64')
-    df_prepared['start'] = pd.to_datetime(df_prepared['start'], format='%d/%m/%Y')
-    df_prepared['end'] = pd.to_datetime(df_prepared['end'], format='%d/%m/%Y')
-    object = ['type', 'country', 'host']
-    df_prepared[object] = df_prepared[object].astype('string')
-
-    duration_values = (df_prepared['end'] - df_prepared['start']).dt.days.astype('Int64')
-    df_prepared.insert(df_prepared.columns.get_loc('end') + 1, 'duration', duration_values)
-
-    npc_file = Path(__file__).parent.parent.joinpath("data", "npc_codes.csv")
-    npc_df = pd.read_csv(npc_file, usecols=['Code', 'Name'], encoding='utf-8', encoding_errors='ignore')
+    # to_numeric converts object columns in C, so astype('Int64') does not box each value
+    counts = df_prepared[columns_to_change].apply(pd.to_numeric)
+    df_prepared[columns_to_change] = counts.astype('Int64')
+    # Low cardinality text columns are stored as category codes plus a small dictionary
+    object = [col for col in ['type', 'country', 'host']
+              if not isinstance(df_prepared[col].dtype, pd.CategoricalDtype)]
+    df_prepared[object] = df_prepared[object].astype('category')
+    df_prepared = df_prepared.assign(duration=duration_values)
+
+    npc_file = _DATA_DIR / "npc_codes.csv"
+    npc_df = pd.read_csv(npc_file, usecols=['Code', 'Name'], encoding='utf-8', encoding_errors='ignore',
+                         engine='pyarrow')
     replacement_names = {
     'UK': 'Great Britain',
     'USA': 'United States of America',
@@ -70,21 +124,42 @@ def data_prep(df):
     'Russia': 'Russian Federation',
     'China': "People's Republic of China"
     }
-    df_prepared['country'] = df_prepared['country'].replace(replacement_names)
-    df_prepared = df_prepared.merge(npc_df, how='left', left_on='country', right_on='Name')
-    df_prepared = df_prepared.drop(columns=['Name'])
-    out_file = Path(__file__).parent.parent.joinpath("data", "prepared.csv")
+    # Mapping a categorical only renames the categories, not every row. An alias and its target
+    # may both be present (e.g. 'UK' and 'Great Britain'), so the result is re-categorised
+    df_prepared['country'] = df_prepared['country'].map(
+        lambda x: replacement_names.get(x, x)).astype('category')
+    # Mapping a categorical only looks up each category once, not every row. Names must be
+    # unique so the lookup is many-to-one, as a merge with validate='m:1' would require
+    npc_df = npc_df.dropna(subset=['Name']).drop_duplicates('Name')
+    code_map = dict(zip(npc_df['Name'], npc_df['Code']))
+    # Categorical.map only returns a category when every country is found, so pin the dtype
+    df_prepared['Code'] = df_prepared['country'].map(code_map).astype('category')
+    # Reorder once so duration follows end
+    desired_order = list(df_prepared.columns.drop(['duration']))
+    desired_order.insert(desired_order.index('end') + 1, 'duration')
+    df_prepared = df_prepared[desired_order]
+    out_file = _DATA_DIR / "prepared.csv"
     df_prepared.to_csv(out_file, index=False)
     return df_prepared
 
 if __name__ == "__main__":
 
-    csv_file = Path(__file__).parent.parent.joinpath("data", "paralympics_raw.csv")
-    xlsx_file = Path(__file__).parent.parent.joinpath("data", "paralympics_all_raw.xlsx")
+    csv_file = _DATA_DIR / "paralympics_raw.csv"
+    xlsx_file = _DATA_DIR / "paralympics_all_raw.xlsx"
     
-    csv_df = pd.read_csv(csv_file)
-    xlsx_1_df = pd.read_excel(xlsx_file, sheet_name=0)
-    xlsx_2_df = pd.read_excel(xlsx_file, sheet_name=2)
+    # Only read the columns data_prep keeps plus 'disabilities_included', used by categorial()
+    category_dtypes = {'type': 'category', 'country': 'category', 'host': 'category'}
+    csv_df = pd.read_csv(csv_file, usecols=KEEP_COLS + ['disabilities_included'],
+                         parse_dates=['start', 'end'],
+                         date_format='%d/%m/%Y', dtype=category_dtypes,
+                         engine='pyarrow', dtype_backend='pyarrow')
+    # Read both sheets in one call, calamine is much faster but needs python-calamine installed
+    try:
+        sheets = pd.read_excel(xlsx_file, sheet_name=[0, 2], engine='calamine')
+    except ImportError:
+        sheets = pd.read_excel(xlsx_file, sheet_name=[0, 2], engine='openpyxl',
+                               engine_kwargs={'read_only': True, 'data_only': True})
+    xlsx_1_df, xlsx_2_df = sheets[0], sheets[2]
     
 
     # describe_df(csv_df)
@@ -1,4 +1,5 @@
 """ Examples of docstring styles and functions and class that are un-documented. """
+import contextlib
 import sqlite3
 
 import pandas as pd
@@ -7,28 +8,47 @@ import os
 from io import StringIO
 
 
+def _fetch_columns(conn: sqlite3.Connection, table_name: str) -> list:
+    """Returns the column names of the table using an existing connection.
+
+    The column names are read from the cursor description of a query that returns no rows. The
+    table name is quoted as an identifier so it cannot inject SQL.
+    """
+    quoted_name = table_name.replace('"', '""')
+    cursor = conn.execute(f'SELECT * FROM "{quoted_name}" LIMIT 0;')
+    return [col[0] for col in cursor.description]
+
+
+def _column_names(db_path: str, table_name: str, conn: sqlite3.Connection | None) -> list:
+    """Returns the column names using conn if given, otherwise a connection that is then closed."""
+    if conn is not None:
+        return _fetch_columns(conn, table_name)
+    with contextlib.closing(sqlite3.connect(db_path)) as new_conn:
+        return _fetch_columns(new_conn, table_name)
+
+
 # Google-style docstring specification: https://google.github.io/styleguide/pyguide.html#38-comments-and-docstrings
-def get_column_names_g(db_path: str, table_name: str) -> list:
+def get_column_names_g(db_path: str, table_name: str,
+                       conn: sqlite3.Connection | None = None) -> list:
     """Retrieves a list of column names for the specified database table.
 
     Args:
         db_path: Path to the database file
         table_name: Name of the table
+        conn: Optional open connection to use instead of opening one for db_path
 
     Returns:
         col_names: List of column names
+
+    Raises:
+        sqlite3.OperationalError: If the table does not exist in the database
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute(f"PRAGMA table_info({table_name});")
-    col_names = [row[1] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
-    return col_names
+    return _column_names(db_path, table_name, conn)
 
 
 # Numpy-style docstring: https://numpydoc.readthedocs.io/en/latest/format.html#docstring-standard
-def get_column_names_n(db_path: str, table_name: str) -> list:
+def get_column_names_n(db_path: str, table_name: str,
+                       conn: sqlite3.Connection | None = None) -> list:
     """
         Retrieves a list of column names for the specified database table.
 
@@ -38,24 +58,26 @@ def get_column_names_n(db_path: str, table_name: str) -> list:
             Path to the database file.
         table_name : str
             Name of the table.
+        conn : sqlite3.Connection, optional
+            Open connection to use instead of opening one for db_path.
 
         Returns
         -------
         col_names: list
             List of column names.
+
+        Raises
+        ------
+        sqlite3.OperationalError
+            If the table does not exist in the database.
         """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute(f"PRAGMA table_info({table_name});")
-    col_names = [row[1] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
-    return col_names
+    return _column_names(db_path, table_name, conn)
 
 
 # Sphinx/reStructuredText style docstring: https://sphinx-rtd-tutorial.readthedocs.io/en/latest/docstrings.html
 # AI prompt:   /doc Sphinx format docstring
-def get_column_names_s(db_path: str, table_name: str) -> list:
+def get_column_names_s(db_path: str, table_name: str,
+                       conn: sqlite3.Connection | None = None) -> list:
     """
         Retrieves a list of column names for the specified database table.
 
@@ -63,16 +85,13 @@ def get_column_names_s(db_path: str, table_name: str) -> list:
         :type db_path: str
         :param table_name: Name of the table.
         :type table_name: str
+        :param conn: Optional open connection to use instead of opening one for db_path.
+        :type conn: sqlite3.Connection
         :return: List of column names.
         :rtype: list
+        :raises sqlite3.OperationalError: If the table does not exist in the database.
         """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute(f"PRAGMA table_info({table_name});")
-    col_names = [row[1] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
-    return col_names
+    return _column_names(db_path, table_name, conn)
 
 
 # Copilot in VSCode / PyCharm
@@ -166,6 +185,11 @@ def describe(csv_data_file: str) -> dict:
     except Exception as exc:
         raise
 
+    # Compute the summaries once and reuse them for the file and the returned dict
+    head = df.head()
+    tail = df.tail()
+    desc = df.describe(include="all")
+
     # Prepare output file and write textual summaries
     out_path = os.path.join("output", "describe_output.txt")
     with open(out_path, "w", encoding="utf-8") as fh:
@@ -175,10 +199,10 @@ def describe(csv_data_file: str) -> dict:
         fh.write(f"{df.shape}\n\n")
 
         fh.write("Head (first 5 rows):\n")
-        fh.write(df.head().to_string() + "\n\n")
+        fh.write(head.to_string() + "\n\n")
 
         fh.write("Tail (last 5 rows):\n")
-        fh.write(df.tail().to_string() + "\n\n")
+        fh.write(tail.to_string() + "\n\n")
 
         fh.write("Columns:\n")
         fh.write(", ".join(map(str, df.columns)) + "\n\n")
@@ -187,7 +211,7 @@ def describe(csv_data_file: str) -> dict:
         fh.write(df.dtypes.to_string() + "\n\n")
 
         fh.write("Describe:\n")
-        fh.write(df.describe(include="all").to_string() + "\n\n")
+        fh.write(desc.to_string() + "\n\n")
 
         fh.write("Info:\n")
         buf = StringIO()
@@ -197,11 +221,11 @@ def describe(csv_data_file: str) -> dict:
     # Return a dictionary of results for programmatic use
     result = {
         "shape": df.shape,
-        "head": df.head().to_dict(orient="records"),
-        "tail": df.tail().to_dict(orient="records"),
+        "head": head.to_dict(orient="records"),
+        "tail": tail.to_dict(orient="records"),
         "columns": list(df.columns),
         "dtypes": df.dtypes.astype(str).to_dict(),
-        "describe": df.describe(include="all").to_dict(),
+        "describe": desc.to_dict(),
         "info_file": out_path,
     }
     return result
@@ -5,6 +5,8 @@ import pandas as pd
 
 from activities import data
 
+_DATA = importlib.resources.files(data)
+
 
 def print_data(file_path):
     """
@@ -182,8 +184,8 @@ def describe(file_path):
 
 if __name__ == '__main__':
     # Sample data files
-    not_file = importlib.resources.files(data).joinpath("traffic.csv")  # exists
-    is_file = importlib.resources.files(data).joinpath("student_data.csv")  # does not exist
+    not_file = _DATA.joinpath("traffic.csv")  # exists
+    is_file = _DATA.joinpath("student_data.csv")  # does not exist
 
     print_data(not_file)
     print_data(is_file)